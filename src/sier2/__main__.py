@@ -1,4 +1,6 @@
 import argparse
+import sys
+from functools import cache
 from importlib.metadata import version
 
 from . import Config, Library
@@ -13,59 +15,90 @@ def _pkg(module):
     return module.split('.')[0]
 
 
+@cache
+def _version(pkg):
+    """The version of an installed package.
+
+    Looking up a version searches the installed distributions,
+    and a package may provide more than one entry point.
+    """
+
+    return version(pkg)
+
+
+def _write(lines: list[str]):
+    """Write lines to stdout in a single call, and empty the list."""
+
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+        lines.clear()
+
+
 def blocks_cmd(args):
     """Display the blocks found via plugin entry points."""
 
+    # Output is collected and written in one go,
+    # except when verbose, where each block is written as it is loaded.
+    #
+    out: list[str] = []
     seen = set()
     curr_ep = None
+    suffix = args.block
     for entry_point, gi in _find_blocks():
-        show = not args.block or gi.key.endswith(args.block)
+        show = suffix is None or gi.key.endswith(suffix)
         if (curr_ep is None or entry_point != curr_ep) and show:
             pkg = _pkg(entry_point.module)
-            s = f'In {pkg} v{version(pkg)}'
+            s = f'In {pkg} v{_version(pkg)}'
             u = ''  # '\n' + '#' * len(s)
-            print(f'\n{BOLD}{s}{u}{NORM}')
+            out.append(f'\n{BOLD}{s}{u}{NORM}')
             # print(f'\x1b[1mIn {entry_point.module} v{version(entry_point.module)}:\x1b[0m')
             curr_ep = entry_point
 
         if show:
             dup = ' (DUPLICATE)' if gi.key in seen else ''
-            print(f'  {BOLD}{gi.key}: {gi.doc}{NORM}{dup}')
+            out.append(f'  {BOLD}{gi.key}: {gi.doc}{NORM}{dup}')
 
             if args.verbose:
                 block = Library.get_block(gi.key)
-                print(block_doc_text(block))
-                print()
+                out.extend([block_doc_text(block), ''])
+                _write(out)
 
             seen.add(gi.key)
 
+    _write(out)
+
 
 def dags_cmd(args):
     """Display the dags found via plugin entry points."""
 
+    out: list[str] = []
     seen = set()
     curr_ep = None
+    suffix = args.dag
     for entry_point, gi in _find_dags():
-        show = not args.dag or gi.key.endswith(args.dag)
+        show = suffix is None or gi.key.endswith(suffix)
         if (curr_ep is None or entry_point != curr_ep) and show:
             pkg = _pkg(entry_point.module)
-            s = f'In {pkg} v{version(pkg)}'
+            s = f'In {pkg} v{_version(pkg)}'
             u = ''  # '\n' + '#' * len(s)
-            print(f'\n{BOLD}{s}{u}{NORM}')
+            out.append(f'\n{BOLD}{s}{u}{NORM}')
             curr_ep = entry_point
 
         if show:
             dup = ' (DUPLICATE)' if gi.key in seen else ''
-            print(f'  {BOLD}{gi.key}: {gi.doc}{NORM}{dup}')
+            out.append(f'  {BOLD}{gi.key}: {gi.doc}{NORM}{dup}')
 
             if args.verbose:
                 # We have to instantiate the dag to get the documentation.
                 #
                 dag = Library.get_dag(gi.key)
-                print(dag_doc_text(dag))
+                out.append(dag_doc_text(dag))
+                _write(out)
 
             seen.add(gi.key)
 
+    _write(out)
+
 
 def run_cmd(args):
     if args.update_config:
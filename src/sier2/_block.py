@@ -1,5 +1,8 @@
-import inspect
+import sys
+from collections.abc import Mapping
 from enum import StrEnum
+from functools import cache
+from types import MappingProxyType
 from typing import Any, Self
 
 import param
@@ -30,6 +33,13 @@ class BlockState(StrEnum):
     ERROR = 'ERROR'
 
 
+@cache
+def _config_section(key: str) -> str:
+    """The config file section name for a block key."""
+
+    return sys.intern(f'block.{key}')
+
+
 _WAIT_FOR_INPUT_DOC = '''If True, a block executes in two steps.
 
 When the block is executed by a dag, the dag first sets the input
@@ -170,7 +180,10 @@ class Block(param.Parameterized):
         doc='If True, the default __panel__() is wrapped by a panel.Card',
     )
 
-    _block_state = param.String(default=BlockState.READY)
+    # The GUI watches the block state, so it has to be a param,
+    # but it is only set internally, so it doesn't need String validation.
+    #
+    _block_state = param.Parameter(default=BlockState.READY)
 
     is_input_valid_ = param.Boolean(
         default=False,
@@ -179,6 +192,21 @@ class Block(param.Parameterized):
 
     SIER2_KEY = '_sier2__key'
 
+    # A map of "block+output parameter being watched" -> "input parameters",
+    # in the order they were connected. An output parameter can be connected
+    # to more than one input parameter of the same block.
+    # This is used by the dag to detect duplicate connections, and to dump the dag.
+    # Blocks that are never a destination don't need their own map,
+    # so the dag replaces this empty shared map with a dict when it
+    # first connects to the block.
+    #
+    _block_name_map: Mapping[tuple[str, str], list[str]] = MappingProxyType({})
+
+    # The stopper of the dag that is executing this block, if any.
+    # This is set by the dag's block context; see check_stop().
+    #
+    _stopper = None
+
     def __init__(
         self,
         *args,
@@ -234,34 +262,27 @@ class Block(param.Parameterized):
             If True, the default Panel display is wrapped in a ``panel.Card``.
         """
 
-        super().__init__(*args, **kwargs)
-
-        if not self.__doc__:
-            raise BlockError(f'Class {self.__class__} must have a docstring')
-
         # Allow class-level wait_for_input.
         #
-        if wait_for_input is not None:
-            self._wait_for_input = wait_for_input
-        else:
-            attr = 'wait_for_input'
-            if hasattr(type(self), attr):
-                self._wait_for_input = bool(getattr(type(self), attr))
-            else:
-                self._wait_for_input = False
+        if wait_for_input is None:
+            wait_for_input = bool(getattr(type(self), 'wait_for_input', False))
+
+        # Pass the block params to param so they are set
+        # with the other params instead of one at a time.
+        #
+        kwargs.setdefault('_wait_for_input', wait_for_input)
+        kwargs.setdefault('_visible', visible)
+        kwargs.setdefault('_is_card', is_card)
+
+        super().__init__(*args, **kwargs)
 
         # Allow class-level continue_label.
         #
         if continue_label is not None:
             self._continue_label = continue_label
         else:
-            attr = 'continue_label'
-            if hasattr(type(self), attr):
-                self._continue_label = str(getattr(type(self), attr))
-            else:
-                self._continue_label = 'Continue'
+            self._continue_label = str(getattr(type(self), 'continue_label', 'Continue'))
 
-        self._visible = visible
         self.doc = doc
 
         if author is not None:
@@ -280,18 +301,13 @@ class Block(param.Parameterized):
             self.display_options = display_options
 
         self.only_in = only_in
-        self._is_card = is_card
         # self._block_state = BlockState.READY
-        self.logger = _logger.get_logger(self.name)
+
+        # self.logger is created when it is first used; see __getattr__().
 
         self.banner_top_ = param.rx(banners[0] if banners and banners[0] else None)
         self.banner_bot_ = param.rx(banners[1] if banners and banners[1] else None)
 
-        # Maintain a map of "block+output parameter being watched" -> "input parameter".
-        # This is used by _block_event() to set the correct input parameter.
-        #
-        self._block_name_map: dict[tuple[str, str], str] = {}
-
         # # Record this block's output parameters.
         # # If this is an input block, we need to trigger
         # # the output values before executing the next block,
@@ -305,6 +321,50 @@ class Block(param.Parameterized):
         #
         self._sort_key: int | None = None
 
+    def __getattr__(self, name: str):
+        """Create the block's logger the first time it is used.
+
+        Many blocks never log, so don't create a logger for every block.
+        This is only called if normal attribute lookup fails.
+        """
+
+        if name == 'logger':
+            logger = _logger.get_logger(self.name)
+            self.logger = logger
+
+            return logger
+
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    def __init_subclass__(cls, **kwargs):
+        """Check that each block class has a docstring.
+
+        This is a property of the class, so check it once when the class
+        is defined rather than every time a block is created.
+        """
+
+        super().__init_subclass__(**kwargs)
+
+        if not cls.__doc__:
+            raise BlockError(f'Class {cls} must have a docstring')
+
+    @classmethod
+    @cache
+    def _in_names(cls) -> frozenset[str]:
+        """The names of this block class's input params.
+
+        A class's params are fixed, so the names are only found once.
+        """
+
+        return frozenset(name for name in cls.param if name.startswith('in_'))
+
+    @classmethod
+    @cache
+    def _out_names(cls) -> tuple[str, ...]:
+        """The names of this block class's output params, in param order."""
+
+        return tuple(name for name in cls.param if name.startswith('out_'))
+
     @classmethod
     def block_key(cls):
         """The unique key of this block class.
@@ -314,14 +374,22 @@ class Block(param.Parameterized):
         in case of refactoring or name clashes.
         """
 
-        if hasattr(cls, Block.SIER2_KEY):
-            return getattr(cls, Block.SIER2_KEY)
+        key = getattr(cls, Block.SIER2_KEY, None)
+        if key is not None:
+            return key
+
+        return cls._default_key()
 
-        im = inspect.getmodule(cls)
-        if im is None:
-            raise BlockError('Class is not a Block')
+    @classmethod
+    @cache
+    def _default_key(cls) -> str:
+        """The key of this block class if the library hasn't given it one.
 
-        return f'{im.__name__}.{cls.__qualname__}'
+        The library sets SIER2_KEY when it loads a block class, which can
+        happen after the class is used, so only this fallback is cached.
+        """
+
+        return f'{cls.__module__}.{cls.__qualname__}'
 
     def get_config(self, *, block: Self | None = None):
         """Return a dictionary containing keys and values from the section specified by
@@ -357,7 +425,7 @@ class Block(param.Parameterized):
         """
 
         b = block if block is not None else self
-        name = f'block.{b.block_key()}'
+        name = _config_section(b.block_key())
 
         return Config[name]
 
@@ -375,14 +443,23 @@ class Block(param.Parameterized):
             The names of params to be displayed in a GUI.
         """
 
-        names = [
-            name
-            for name in self.param.values()
-            if name.startswith('in_')
-            or not (self.only_in or name.startswith(('out_', '_')) or name.endswith('_') or name == 'name')
-        ]
+        return list(self._pick_names(bool(self.only_in)))
 
-        return names
+    @classmethod
+    @cache
+    def _pick_names(cls, only_in: bool) -> tuple[str, ...]:
+        """The names returned by :func:`~sier2.Block.pick_params`.
+
+        The names depend only on the class's params and ``only_in``,
+        so they are only found once. They are sorted, as they were
+        when they were read from ``param.values()``.
+        """
+
+        return tuple(
+            name
+            for name in sorted(cls.param)
+            if name.startswith('in_') or not (only_in or name.startswith(('out_', '_')) or name.endswith('_') or name == 'name')
+        )
 
     def get_config_value(self, key: str, default: Any = None, *, block: Self | None = None):
         """Return an individual value from the section specified by
@@ -401,7 +478,7 @@ class Block(param.Parameterized):
         """
 
         b = block if block is not None else self
-        name = f'block.{b.block_key()}'
+        name = _config_section(b.block_key())
         value = Config[name, key]
 
         return value if value is not None else default
@@ -433,8 +510,29 @@ class Block(param.Parameterized):
             set while the block is executing, in which case the block should
             stop executing as soon as possible.
         * ``events`` - the param events that caused execute() to be called.
+
+        A long-running ``execute()`` can call :func:`~sier2.Block.check_stop`
+        so it can be stopped while it is executing.
         """
 
+    def check_stop(self):
+        """Raise ``KeyboardInterrupt`` if the dag executing this block has been stopped.
+
+        A dag only checks whether it has been stopped between blocks.
+        A block that takes a long time to execute can call this method
+        periodically (for example, in each iteration of a loop) so it
+        can be stopped while it is executing.
+
+        The dag handles the ``KeyboardInterrupt`` in the same way as a user interrupt:
+        the block state is set to ``INTERRUPTED``, and the dag stops executing.
+
+        If the block is not being executed by a dag, this does nothing.
+        """
+
+        stopper = self._stopper
+        if stopper is not None and stopper.is_stopped:
+            raise KeyboardInterrupt(f'Dag stopped while executing {self.name}')
+
     def banners(self, banners: tuple[str | None, str | None]):
         """Change one or both banners for this block.
 
@@ -511,18 +609,19 @@ class Block(param.Parameterized):
             A dictionary that maps output ("out\\_") names to their param values.
         """
 
-        in_names = [name for name in self.__class__.param if name.startswith('in_')]
-        if any(name not in in_names for name in kwargs):
-            raise BlockError('Only input params can be specified')
+        unknown = kwargs.keys() - self._in_names()
+        if unknown:
+            raise BlockError(f'Only input params can be specified: {", ".join(sorted(unknown))}')
 
-        for name, value in kwargs.items():
-            setattr(self, name, value)
+        # Set the inputs together, so watchers are called once
+        # rather than once per param.
+        #
+        self.param.update(kwargs)
 
         self.prepare()
         self.execute()
 
-        out_names = [name for name in self.__class__.param if name.startswith('out_')]
-        result = {name: getattr(self, name) for name in out_names}
+        result = {name: getattr(self, name) for name in self._out_names()}
 
         return result
 
@@ -557,13 +656,17 @@ class Block(param.Parameterized):
                 )
         """
 
-        attr = '_panel'
-        if not hasattr(self, attr):
+        # Once the default has been injected, this is a single attribute lookup.
+        #
+        try:
+            panel = self._panel
+        except AttributeError:
             from ._panel._default import add_panel_def
 
             add_panel_def(self)
+            panel = self._panel
 
-        return getattr(self, attr)()
+        return panel()
 
 
 class BlockValidateError(BlockError):
@@ -3,7 +3,9 @@
 
 import ast
 import configparser
+import copy
 import os
+from functools import cache
 from pathlib import Path
 from typing import Any
 
@@ -12,7 +14,35 @@ from typing import Any
 #
 CONFIG_UPDATE = 'config_update'
 
+# Evaluated values of these types can be shared; anything else
+# is copied so callers can't change the cached value.
+#
+_IMMUTABLE = (str, bytes, int, float, complex, bool, type(None))
+
+# Common values that don't need to be parsed.
+#
+_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+
+def _eval(v: str) -> Any:
+    """Evaluate a config value as a Python literal.
 
+    Booleans, None, and decimal integers are common enough to be converted
+    directly; anything else is passed to :func:`ast.literal_eval`.
+    """
+
+    if v in _CONSTANTS:
+        return _CONSTANTS[v]
+
+    # Python doesn't allow leading zeros, so leave those to literal_eval().
+    #
+    if v.isascii() and v.isdigit() and (v[0] != '0' or v == '0'):
+        return int(v)
+
+    return ast.literal_eval(v)
+
+
+@cache
 def _default_config_file():
     """Determine the location of the config file sier2.ini.
 
@@ -25,10 +55,10 @@ def _default_config_file():
 
     Otherwise, use ``$HOME/.config/sier2/sier2.ini``.
 
-    If not using ``SIER2_INI``, the ``sier2`` directory will be created
-    if it does not exist.
+    The ``sier2`` directory is not created here; it is created
+    if and when the config file is written.
 
-    TODO don't create the sier2 directory until the ini file is written.
+    The environment is only looked at once.
     """
 
     # If a config file has been explicitly set in an environment variable,
@@ -53,9 +83,6 @@ def _default_config_file():
 
         prdir = prdir / 'sier2'
 
-    if not prdir.exists():
-        prdir.mkdir(parents=True)
-
     return prdir / 'sier2.ini'
 
 
@@ -120,6 +147,8 @@ class _Config:
     def _clear(self):
         self._location = _default_config_file()
         self._config = {}
+        self._values = {}
+        self._mtime_ns = None
         self._loaded = False
 
     @property
@@ -158,9 +187,11 @@ class _Config:
         new_config = configparser.ConfigParser()
         new_config.read_string(ini)
 
+        # ConfigParser.read() skips files that can't be opened,
+        # so there's no need to check that the file exists first.
+        #
         config = configparser.ConfigParser()
-        if self._location.is_file():
-            config.read(self._location)
+        config.read(self._location)
 
         for section_name in new_config.sections():
             if not config.has_section(section_name):
@@ -179,12 +210,20 @@ class _Config:
                     #     config[section_name][k] = new_config[section_name][k]
 
         if write_to_file:
+            self._location.parent.mkdir(parents=True, exist_ok=True)
             with open(self._location, 'w', encoding='utf-8') as f:
                 config.write(f)
 
         self._config = config
+        self._values = {}
         self._loaded = True
 
+        # If the merged config was written, it is the same as the file,
+        # so a later change to the file is reloaded. Otherwise, the merged
+        # config is newer than the file, and reloading would lose the update.
+        #
+        self._mtime_ns = self._file_mtime_ns() if write_to_file else None
+
     def _load(self):
         """Load the config.
 
@@ -192,18 +231,54 @@ class _Config:
         """
 
         self._config = configparser.ConfigParser()
-        if self._location.is_file():
-            self._config.read(self._location)
+        self._values = {}
+        self._mtime_ns = self._file_mtime_ns()
+        self._config.read(self._location)
 
         # The config has been loaded, even if the file didn't exist.
         #
         self._loaded = True
 
+    def _file_mtime_ns(self) -> int:
+        """The modification time of the config file, or -1 if it doesn't exist."""
+
+        try:
+            return self._location.stat().st_mtime_ns
+        except OSError:
+            return -1
+
+    def reload_if_changed(self) -> bool:
+        """Reload the config file if it has changed since it was loaded.
+
+        A long-running application (such as a Panel server) can call this
+        to see changes to the config file without reading the file every time.
+
+        Only a config that matches the file is reloaded: one that was loaded from
+        the file, or that was written to the file by :func:`~sier2.Config.update`.
+        A config that hasn't been loaded yet will be loaded when it is first used.
+        A config updated by :func:`~sier2.Config.update` without writing
+        to the file is never reloaded, so the update is not lost.
+
+        Returns
+        -------
+        bool
+            True if the config file was reloaded.
+        """
+
+        if self._mtime_ns is None or self._file_mtime_ns() == self._mtime_ns:
+            return False
+
+        self._load()
+
+        return True
+
     def _load_string(self, sconfig):
         """For testing."""
 
         self._config = configparser.ConfigParser()
         self._config.read_string(sconfig)
+        self._values = {}
+        self._mtime_ns = None
         self._loaded = True
 
     def __getitem__(self, section_name: str | tuple[str, str]) -> Any | dict[str, Any]:
@@ -238,23 +313,32 @@ class _Config:
             if key not in section:
                 return None
 
-            try:
-                v = section[key]
-                return ast.literal_eval(v)
-            except ValueError:
-                raise ValueError(f'Cannot eval section [{section_name}], key {key}, value {v}')
+            return self._value(section_name, key)
 
         if section_name not in self._config:
             return {}
 
-        c = {}
-        for key, v in self._config[section_name].items():
+        return {key: self._value(section_name, key) for key in self._config[section_name]}
+
+    def _value(self, section_name: str, key: str) -> Any:
+        """Return the evaluated value of a key in a section that exists.
+
+        Each value is only evaluated once; the config doesn't change
+        after it has been loaded.
+        """
+
+        try:
+            value = self._values[section_name, key]
+        except KeyError:
+            v = self._config[section_name][key]
             try:
-                c[key] = ast.literal_eval(v)
+                value = _eval(v)
             except ValueError:
                 raise ValueError(f'Cannot eval section [{section_name}], key {key}, value {v}')
 
-        return c
+            self._values[section_name, key] = value
+
+        return value if isinstance(value, _IMMUTABLE) else copy.deepcopy(value)
 
 
 Config = _Config()
@@ -4,7 +4,7 @@ import sys
 import threading
 import tomllib
 from collections import defaultdict, deque
-from collections.abc import Iterable
+from collections.abc import Collection, Iterable
 from dataclasses import dataclass, field  # , KW_ONLY, field
 from importlib.metadata import entry_points
 from typing import Any
@@ -113,16 +113,29 @@ class _BlockContext:
     def __enter__(self):
         self.block._block_state = BlockState.EXECUTING
 
+        # Let the block see the stopper, so a long-running block
+        # can use check_stop() to stop when the dag is stopped.
+        #
+        self.block._stopper = getattr(self.dag, '_stopper', None)
+
         return self.block
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        # The block is no longer being executed by the dag,
+        # so check_stop() must not see the dag's stopper.
+        # Do this first, because an error below is re-raised.
+        #
+        self.block._stopper = None
+
         if exc_type is None:
             self.block._block_state = BlockState.WAITING if self.block._wait_for_input else BlockState.SUCCESSFUL
         elif exc_type is KeyboardInterrupt:
-            self.block_state._block_state = BlockState.INTERRUPTED
+            state = BlockState.INTERRUPTED
+            self.block._block_state = state
             if not self.dag._is_pyodide:
                 self.dag._stopper.event.set()
-            print(f'KEYBOARD INTERRUPT IN BLOCK {self.name}')
+            if self.dag_logger:
+                self.dag_logger.exception('KEYBOARD INTERRUPT', block_name=self.block.name, block_state=state)
         else:
             state = BlockState.ERROR
             self.block._block_state = state
@@ -252,9 +265,11 @@ class Dag:
             Show the dag docstring if True.
         """
 
-        # The dag: a list of edges between blocks.
+        # The dag: the edges between blocks, in the order they were added.
+        # Each edge maps to the number of param connections along it,
+        # so iterating yields (src, dst) pairs and membership is O(1).
         #
-        self._block_pairs: list[tuple[Block, Block]] = []
+        self._block_pairs: dict[tuple[Block, Block], int] = {}
 
         # A bag of blocks.
         # These are blocks that aren't connected to any other blocks.
@@ -387,13 +402,20 @@ class Dag:
         # if not connections:
         #     raise BlockError('There must be at least one connection')
 
-        # Group watchers for each (src, dst) block.
-        # This optimises the number of watchers.
+        # Group watchers for each src block: map each connected out param
+        # to the dst blocks that it feeds. This optimises the number of
+        # watchers: each src block has a single watcher that fans out
+        # to its dst blocks.
         #
         # If we just add a watcher per param in the loop, then
         # param.update() won't batch the events.
         #
-        src_out_params_dict = defaultdict(list)
+        src_out_params_dict: dict[Block, dict[str, list[tuple[Block, str]]]] = defaultdict(dict)
+
+        # The blocks upstream of each block, kept up to date as pairs are added,
+        # so checking a new pair for a cycle doesn't have to look at every pair.
+        #
+        incoming: dict[Block, list[Block]] = defaultdict(list)
 
         # Ensure that the sort cache is cleared.
         #
@@ -455,10 +477,10 @@ class Dag:
                 dst._sort_key = sort_key
 
             if _DISALLOW_CYCLES:  # noqa: SIM102
-                # _has_cycle() does a topological sort,
-                # which requires _sort_key to be set.
+                # The existing pairs are acyclic, so only check
+                # whether the new pair closes a cycle.
                 #
-                if _has_cycle(self._block_pairs + [(src, dst)]):
+                if _closes_cycle(incoming, src, dst):
                     raise BlockError(f'The connection at index {ix} would create a cycle')
 
             # Checking for the same name also checks for the same block.
@@ -498,14 +520,20 @@ class Dag:
             if src_param.allow_refs:
                 raise BlockError(f'Source parameter {src}.{src_param.name} must not be "allow_refs=True"')
 
-            if dst._block_name_map.get((src.name, src_param.name)) == dst_param.name:
+            name_map = dst._block_name_map
+            if dst_param.name in name_map.get((src.name, src_param.name), ()):
                 raise BlockError(f'The params at index {ix} are already connected')
 
-            dst._block_name_map[src.name, src_param.name] = dst_param.name
-            src_out_params_dict[src, dst].append(src_param.name)
+            if not isinstance(name_map, dict):
+                name_map = dst._block_name_map = {}
+
+            name_map.setdefault((src.name, src_param.name), []).append(dst_param.name)
+            src_out_params_dict[src].setdefault(src_param.name, []).append((dst, dst_param.name))
 
             if (src, dst) not in self._block_pairs:
-                self._block_pairs.append((src, dst))
+                incoming[dst].append(src)
+
+            self._block_pairs[src, dst] = self._block_pairs.get((src, dst), 0) + 1
 
         if not _is_connected(self._block_pairs):
             raise BlockError('Dag is not connected')
@@ -514,13 +542,13 @@ class Dag:
         #
         _load_block_defaults(self)
 
-        # After we've gathered all the per-src-dst connections,
-        # watch the source params for each connection.
+        # After we've gathered all the per-src connections,
+        # watch the source params of each src block.
         #
-        for (src, dst), src_out_params in src_out_params_dict.items():
+        for src, out_params in src_out_params_dict.items():
             src.param.watch(
-                lambda *events, dst=dst: self._param_event(dst, *events),
-                src_out_params,
+                lambda *events, out_params=out_params: self._param_event(out_params, *events),
+                list(out_params),
                 onlychanged=False,
             )
 
@@ -546,33 +574,37 @@ class Dag:
     #         ix = self._block_bag.find(block)
     #         del self._block_bag[ix]
 
-    def _param_event(self, dst: Block, *events):
-        """The callback for a watch event."""
+    def _param_event(self, out_params: dict[str, list[tuple[Block, str]]], *events):
+        """The callback for a watch event.
+
+        ``out_params`` maps each watched out param of the source block
+        to the (dst block, in param name) pairs it is connected to.
+        These are resolved when the dag is built, so events don't need
+        to look up the dst param names.
+        """
 
+        # Map each event to the input params in the dst blocks.
+        #
+        dst_values: dict[Block, dict[str, Any]] = {}
         for event in events:
-            cls = event.cls.name
-            name = event.name
             new = event.new
-
-            # The input param in the dst block.
-            #
-            inp = dst._block_name_map[cls, name]
-
-            # Look for the destination block in the event queue.
-            # If found, update the param value dictionary,
-            # else append a new item.
-            # This ensures that all param updates for a destination
-            # block are merged into a single queue item, even if the
-            # updates come from different source blocks.
-            #
+            for dst, dst_name in out_params[event.name]:
+                dst_values.setdefault(dst, {})[dst_name] = new
+
+        # Look for each destination block in the event queue.
+        # If found, update the param value dictionary,
+        # else append a new item.
+        # This ensures that all param updates for a destination
+        # block are merged into a single queue item, even if the
+        # updates come from different source blocks.
+        #
+        for dst, values in dst_values.items():
             for item in self._block_queue:
                 if dst is item.dst:
-                    item.values[inp] = new
+                    item.values.update(values)
                     break
             else:
-                item = _InputValues(dst)
-                item.values[inp] = new
-                self._block_queue.append(item)
+                self._block_queue.append(_InputValues(dst, values))
 
     def execute_after_input(self, block: Block, *, dag_logger=None):
         """Restart dag execution at the specified block.
@@ -918,9 +950,9 @@ class Dag:
 
             # Get src params that have been connected to dst params.
             #
-            nmap = {(gname, sname): dname for (gname, sname), dname in d._block_name_map.items() if gname == s.name}
+            nmap = [(sname, dname) for (gname, sname), dnames in d._block_name_map.items() if gname == s.name for dname in dnames]
 
-            for (gname, sname), dname in nmap.items():
+            for sname, dname in nmap:
                 args = {'src_param_name': sname, 'dst_param_name': dname}
 
                 # for pname, data in s.param.watchers.items():
@@ -986,59 +1018,102 @@ def topological_sort(pairs):
             return L   (a topologically sorted order)
     """
 
-    # TODO use a cache - the chart does los of sorting.
-    #
     if not pairs:
         return [], []
 
-    def edge(pairs, n, m):
-        for ix, pair in enumerate(pairs):
-            if pair == (n, m):
-                return ix
-
-        return None
-
-    def has_incoming(pairs, m):
-        return any(d is m for _, d in pairs)
+    # Give each block a compact integer id in the order it is first seen,
+    # so the sort itself only does list indexing.
+    #
+    node_index: dict[Block, int] = {}
+    nodes: list[Block] = []
+    edges: list[tuple[int, int]] = []
+    for s, d in pairs:
+        for b in s, d:
+            if b not in node_index:
+                node_index[b] = len(nodes)
+                nodes.append(b)
 
-    remaining = pairs[:]
-    L = []
+        edges.append((node_index[s], node_index[d]))
 
-    srcs, dsts = zip(*remaining)
+    # Build the adjacency lists and in-degrees.
+    # A pair may be listed more than once; the duplicates don't
+    # change the ordering, so only the first is kept.
+    #
+    out_adj: list[list[int]] = [[] for _ in nodes]
+    in_degree = [0] * len(nodes)
+    seen = set()
+    for e in edges:
+        if e not in seen:
+            seen.add(e)
+            out_adj[e[0]].append(e[1])
+            in_degree[e[1]] += 1
 
-    # Sort the current heads by name so they have a consistent ordering.
+    # Sort the current heads by sort key so they have a consistent ordering.
     #
-    S = deque(sorted({s for s in srcs if s not in dsts}, key=lambda block: block._sort_key))
+    S = deque(sorted((i for i in range(len(nodes)) if in_degree[i] == 0), key=lambda i: nodes[i]._sort_key))
 
+    L = []
+    done = [False] * len(nodes)
     while S:
         # A topological sort is non-unique; this is why.
         # Nodes can be removed from S in arbitrary order.
         # We use .popleft() to maintain a consistent ordering.
         #
         n = S.popleft()
-        L.append(n)
-        S_next = []
-        for _, m in remaining[:]:
-            if (e := edge(remaining, n, m)) is not None:
-                del remaining[e]
-                if not has_incoming(remaining, m):
-                    S_next.append(m)
-
-        # Also sort this next layer of blocks.
-        #
-        # S_next.sort(key=lambda block: block._sort_key)
-        S.extend(S_next)
+        L.append(nodes[n])
+        done[n] = True
+        for m in out_adj[n]:
+            in_degree[m] -= 1
+            if in_degree[m] == 0:
+                S.append(m)
+
+    # Any edge that starts at a block that wasn't reached is part of
+    # (or downstream of) a cycle.
+    #
+    remaining = [pair for pair, (s, _) in zip(pairs, edges) if not done[s]]
 
     return L, remaining
 
 
-def _has_cycle(block_pairs: list[tuple[Block, Block]]):
+def _has_cycle(block_pairs: Collection[tuple[Block, Block]]):
     _, remaining = topological_sort(block_pairs)
 
     return len(remaining) > 0
 
 
-def _get_sorted(block_pairs: list[tuple[Block, Block]]) -> list[Block]:
+def _closes_cycle(incoming: dict[Block, list[Block]], src: Block, dst: Block) -> bool:
+    """Determine if adding the pair (src, dst) to an acyclic dag would create a cycle.
+
+    A cycle is created only if src can already be reached from dst,
+    i.e. dst is an ancestor of src. Rather than sorting the whole dag,
+    walk backwards from src looking for dst.
+
+    Parameters
+    ----------
+    incoming: dict[Block, list[Block]]
+        The blocks that have an edge to each block in the dag.
+    """
+
+    if src is dst:
+        return True
+
+    # Only blocks that can reach src matter, so only their edges are visited.
+    #
+    visited = {src}
+    stack = [src]
+    while stack:
+        for s in incoming.get(stack.pop(), ()):
+            if s is dst:
+                return True
+
+            if s not in visited:
+                visited.add(s)
+                stack.append(s)
+
+    return False
+
+
+def _get_sorted(block_pairs: Collection[tuple[Block, Block]]) -> list[Block]:
     ordered, remaining = topological_sort(block_pairs)
 
     if remaining:
@@ -1058,7 +1133,7 @@ def _for_each_once(pairs):
                 yield g
 
 
-def _is_connected(pairs: list[tuple[Block, Block]]):
+def _is_connected(pairs: Collection[tuple[Block, Block]]):
     """Determine if the list of pairs forms a connected graph."""
 
     if not pairs:
@@ -1067,7 +1142,7 @@ def _is_connected(pairs: list[tuple[Block, Block]]):
     n_blocks = sum(1 for _ in _for_each_once(pairs))
 
     visited = set()
-    start = pairs[0][0]
+    start = next(iter(pairs))[0]
 
     stack = [start]
     visited.add(start)
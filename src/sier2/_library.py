@@ -1,6 +1,7 @@
 import warnings
 from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import cache
 from importlib.metadata import EntryPoint, entry_points
 from typing import Any, cast
 
@@ -13,6 +14,12 @@ from ._util import _import_item
 _block_library: dict[str, type[Block] | None] = {}
 _dag_library: set[str] = set()
 
+# Set when the plugins have been scanned, so repeated collects
+# (including when no plugins were found) don't rescan them.
+#
+_blocks_collected = False
+_dags_collected = False
+
 
 @dataclass
 class Info:
@@ -34,6 +41,21 @@ def _find_dags():
     yield from _find('dags')
 
 
+@cache
+def _dag_index() -> dict[str, str | None]:
+    """Map the simple name of each dag (the last part of its key) to its key.
+
+    A simple name that is used by more than one dag maps to None.
+    """
+
+    index: dict[str, str | None] = {}
+    for _, d in _find_dags():
+        name = d.key.replace(':', '.').rpartition('.')[2]
+        index[name] = None if name in index else d.key
+
+    return index
+
+
 def run_dag(dag_name):
     """Run the named dag."""
 
@@ -41,29 +63,17 @@ def run_dag(dag_name):
     # but more of the qualified name where there are dups.
     #
 
-    ix = dag_name.rfind('.')
-    if ix == -1:
-        found_dag = None
-        for _, d in _find_dags():
-            dparts = d.key.replace(':', '.').split('.')
-            if dparts[-1] == dag_name:
-                if found_dag:
-                    raise BlockError(f'Found duplicate: {dag_name}, d')
-
-                found_dag = d
-
-        if found_dag is None:
+    if '.' not in dag_name:
+        index = _dag_index()
+        if dag_name not in index:
             raise BlockError('No such dag')
 
-        dag_name = found_dag.key
-        ix = dag_name.rfind('.')
+        if index[dag_name] is None:
+            raise BlockError(f'Found duplicate: {dag_name}')
 
-    # m = importlib.import_module(dag_name[:ix])
-    # func = getattr(m, dag_name[ix+1:])
-    # # if not issubclass(cls, Block):
-    # #     raise BlockError(f'{key} is not a block')
+        dag_name = index[dag_name]
 
-    func = _import_item(found_dag.key)
+    func = _import_item(dag_name)
 
     dag = func()
     if not hasattr(dag, 'show'):
@@ -72,6 +82,47 @@ def run_dag(dag_name):
     dag.show()
 
 
+@cache
+def _entry_points() -> tuple[EntryPoint, ...]:
+    """Return the ``sier2.library`` entry points.
+
+    Looking up entry points scans every installed distribution, so only do it once.
+    The selection is frozen as a tuple so iterating it does no further filtering.
+    Call :func:`~sier2.Library.invalidate` to force a rescan.
+    """
+
+    return tuple(entry_points(group='sier2.library'))
+
+
+@cache
+def _load_infos(entry_point: EntryPoint, func_name: str) -> tuple[Info, ...]:
+    """Call ``load()`` on an entry point to get a module,
+    then call ``getattr(module, func_name)()`` to get a list of ``Info`` instances.
+
+    Loading imports the plugin module, and the plugin function may do
+    arbitrary work, so the result is cached per entry point and function name.
+    """
+
+    try:
+        lib = entry_point.load()
+        func = getattr(lib, func_name, None)
+        if func is None:
+            return ()
+
+        if not callable(func):
+            warnings.warn(f'In {entry_point.module}, {func} is not a function')
+            return ()
+
+        info_list: list[Info] = func()
+        if not isinstance(info_list, list) or any(not isinstance(s, Info) for s in info_list):
+            warnings.warn(f'In {entry_point.module}, {func} does not return a list of {Info.__name__} instances')
+            return ()
+
+        return tuple(info_list)
+    except Exception as e:
+        raise BlockError(f'While loading {entry_point}: {e}') from e
+
+
 def _find(func_name: str) -> Iterable[tuple[EntryPoint, Info]]:
     """Use ``importlib.metadata.entry_points`` to look up entry points named ``sier2.library``.
 
@@ -86,24 +137,29 @@ def _find(func_name: str) -> Iterable[tuple[EntryPoint, Info]]:
         Either ``'blocks'`` or ``'dags'``.
     """
 
-    library = entry_points(group='sier2.library')
-
-    for entry_point in library:
-        try:
-            lib = entry_point.load()
-            func = getattr(lib, func_name, None)
-            if func is not None:
-                if not callable(func):
-                    warnings.warn(f'In {entry_point.module}, {func} is not a function')
-                else:
-                    info_list: list[Info] = func()
-                    if not isinstance(info_list, list) or any(not isinstance(s, Info) for s in info_list):
-                        warnings.warn(f'In {entry_point.module}, {func} does not return a list of {Info.__name__} instances')
-                    else:
-                        for gi in info_list:
-                            yield entry_point, gi
-        except Exception as e:
-            raise BlockError(f'While loading {entry_point}: {e}') from e
+    for entry_point in _entry_points():
+        for gi in _load_infos(entry_point, func_name):
+            yield entry_point, gi
+
+
+def _collect_keys(infos: Iterable[tuple[EntryPoint, Info]], existing, kind: str) -> list[str]:
+    """Return the keys of the infos that are not already in existing.
+
+    A warning is displayed for each key that is already present,
+    or is provided more than once.
+    """
+
+    found: dict[str, EntryPoint] = {}
+    for entry_point, gi in infos:
+        if gi.key in found:
+            warnings.warn(f'{kind} plugin {entry_point}: key {gi.key} already in library')
+        else:
+            found[gi.key] = entry_point
+
+    for key in found.keys() & existing:
+        warnings.warn(f'{kind} plugin {found.pop(key)}: key {key} already in library')
+
+    return list(found)
 
 
 class Library:
@@ -118,21 +174,34 @@ class Library:
         which would cause a lot of imports to happen. Therefore, we just
         create the keys in the dictionary, and let ``get_block()`` import
         block modules as required.
+
+        Blocks are only collected once; subsequent calls do nothing.
         """
 
-        for entry_point, gi in _find_blocks():
-            if gi.key in _block_library:
-                warnings.warn(f'Block plugin {entry_point}: key {gi.key} already in library')
-            else:
-                _block_library[gi.key] = None
+        global _blocks_collected
+        if _blocks_collected:
+            return
+
+        found = _collect_keys(_find_blocks(), _block_library.keys(), 'Block')
+        _block_library.update(dict.fromkeys(found))
+
+        _blocks_collected = True
 
     @staticmethod
     def collect_dags():
-        for entry_point, gi in _find_dags():
-            if gi.key in _dag_library:
-                warnings.warn(f'Dag plugin {entry_point}: key {gi.key} already in library')
-            else:
-                _dag_library.add(gi.key)
+        """Collect dag information.
+
+        Dags are only collected once; subsequent calls do nothing.
+        """
+
+        global _dags_collected
+        if _dags_collected:
+            return
+
+        found = _collect_keys(_find_dags(), _dag_library, 'Dag')
+        _dag_library.update(found)
+
+        _dags_collected = True
 
     @staticmethod
     def add_block(block_class: type[Block], key: str | None = None):
@@ -180,8 +249,7 @@ class Library:
             A block class.
         """
 
-        if not _block_library:
-            Library.collect_blocks()
+        Library.collect_blocks()
 
         if key not in _block_library:
             raise BlockError(f'Block name {key} is not in the library')
@@ -218,8 +286,7 @@ class Library:
             A dag.
         """
 
-        if not _dag_library:
-            Library.collect_dags()
+        Library.collect_dags()
 
         if key not in _dag_library:
             raise BlockError(f'Dag name {key} is not in the library')
@@ -236,6 +303,10 @@ class Library:
     def load_dag(dump: dict[str, Any]) -> Dag:
         """Load a dag from a serialised structure produced by Block.dump()."""
 
+        # Look up each block class once, however many instances of it there are.
+        #
+        classes = {key: Library.get_block(key) for key in dict.fromkeys(g['block'] for g in dump['blocks'])}
+
         # Create new instances of the specified blocks.
         #
         instances = {}
@@ -243,8 +314,7 @@ class Library:
             block_key = g['block']
             instance = g['instance']
             if instance not in instances:
-                gclass = Library.get_block(block_key)
-                instances[instance] = gclass(**g['args'])
+                instances[instance] = classes[block_key](**g['args'])
             else:
                 raise BlockError(f'Instance {instance} ({block_key}) already exists')
 
@@ -274,7 +344,31 @@ class Library:
 
     @staticmethod
     def clear():
+        """Clear the block library.
+
+        The next lookup will collect the block plugins again.
+        """
+
+        global _blocks_collected
         _block_library.clear()
+        _blocks_collected = False
+
+    @staticmethod
+    def invalidate():
+        """Forget everything found by scanning the plugins.
 
+        The block and dag libraries are cleared, and the cached entry points
+        and plugin results are discarded, so the next lookup rescans the
+        installed plugins. This is useful if plugins have been installed or
+        removed since the library was collected.
+        """
+
+        global _blocks_collected, _dags_collected
+        _block_library.clear()
+        _dag_library.clear()
+        _blocks_collected = False
+        _dags_collected = False
 
-# Library.collect()
+        _entry_points.cache_clear()
+        _load_infos.cache_clear()
+        _dag_index.cache_clear()
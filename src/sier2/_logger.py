@@ -17,62 +17,13 @@ class BlockAdapter(logging.LoggerAdapter):
     """
 
     def __init__(self, logger, block_name: str, block_state):
-        super().__init__(logger)
+        # The extra values are the same for every message,
+        # so build them once and let LoggerAdapter.process() pass them on.
+        #
+        super().__init__(logger, {'block_name': block_name, 'block_state': block_state})
         self.block_name = block_name
         self.block_state = block_state
 
-    def debug(self, msg, *args):
-        super().debug(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def info(self, msg, *args):
-        super().info(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def warning(self, msg, *args):
-        super().warning(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def error(self, msg, *args):
-        super().error(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def exception(self, msg, *args, exc_info=True):
-        super().error(
-            msg,
-            *args,
-            exc_info=exc_info,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def critical(self, msg, *args):
-        super().critical(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': self.block_state},
-        )
-
-    def process(self, msg, kwargs):
-        # print(f'BLOCKADAPTER {msg=} {kwargs=} {self.extra=}')
-        if 'block_state' not in kwargs['extra']:
-            kwargs['extra']['block_state'] = '?'
-        if 'block_name' not in kwargs['extra']:
-            kwargs['extra']['block_name'] = 'g'
-
-        return msg, kwargs
-
 
 _logger = logging.getLogger('block.stream')
 _logger.setLevel(logging.INFO)
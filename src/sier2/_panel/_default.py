@@ -1,5 +1,6 @@
 import warnings
 from collections.abc import Callable
+from types import MappingProxyType
 
 import panel as pn
 from param.parameters import DataFrame
@@ -7,17 +8,33 @@ from param.parameters import DataFrame
 from .._block import Block, BlockError
 from ..panel._panel_util import _get_state_color
 
+# Styles used by every card header.
+# Panel renders each widget in its own shadow root, so page-level CSS
+# (pn.config.raw_css) doesn't reach them; define the styles once instead.
+# These are read-only; each widget gets its own copy, so changing
+# one card's styles doesn't change the others.
+#
+_TITLE_STYLES = MappingProxyType({'font-size': '1.17em', 'font-weight': 'bold'})
+_SPACER_STYLES = MappingProxyType({'min_width': '1px', 'min_height': '1px'})
+
+
+def _get_light_styles(color: str) -> dict[str, str]:
+    """The styles of a state light of the given color.
+
+    Each light gets its own dict, so changing one light's styles
+    doesn't change the other lights.
+    """
+
+    return {
+        'width': '20px',
+        'height': '20px',
+        'background': color,
+        'border-radius': '10px',
+    }
+
 
 def _get_state_light(color: str) -> pn.Spacer:
-    return pn.Spacer(
-        margin=(8, 0, 0, 0),
-        styles={
-            'width': '20px',
-            'height': '20px',
-            'background': color,
-            'border-radius': '10px',
-        },
-    )
+    return pn.Spacer(margin=(8, 0, 0, 0), styles=_get_light_styles(color))
 
 
 def _card_for_block(block: Block, pane: pn.pane.Pane, _with_light: bool = False) -> pn.Card:
@@ -26,9 +43,8 @@ def _card_for_block(block: Block, pane: pn.pane.Pane, _with_light: bool = False)
     name_text = pn.widgets.StaticText(
         value=block.name,
         css_classes=['card-title'],
-        styles={'font-size': '1.17em', 'font-weight': 'bold'},
+        styles=dict(_TITLE_STYLES),
     )
-    spacer = pn.HSpacer(styles={'min_width': '1px', 'min_height': '1px'})
 
     # Does this block have documentation to be displayed in the card?
     #
@@ -65,23 +81,29 @@ def _card_for_block(block: Block, pane: pn.pane.Pane, _with_light: bool = False)
 
     row = [name_text, pn.VSpacer()]
     if _with_light:
-        row.extend([spacer, _get_state_light(_get_state_color(block._block_state))])
+        spacer = pn.HSpacer(styles=dict(_SPACER_STYLES))
+        light = _get_state_light(_get_state_color(block._block_state))
+        row.extend([spacer, light])
 
     header = pn.Row(*row)
 
     if _with_light:
 
-        def state_change(_block_state):
+        def state_change(event):
             """Watcher for the block state.
 
-            Updates the state light.
+            Updates the state light by changing its color, rather than
+            replacing it with a new light. The styles must be reassigned
+            for panel to see the change.
             """
 
-            header[-1] = _get_state_light(_get_state_color(block._block_state))
+            light.styles = _get_light_styles(_get_state_color(event.new))
 
         # Watch the block state so we can update the status light.
+        # Only the new value is needed, so use a plain watcher rather than
+        # watch_values(), which builds a dict of values for each change.
         #
-        block.param.watch_values(state_change, '_block_state')
+        block.param.watch(state_change, '_block_state')
 
     # header = pn.Row(
     #     name_text,
@@ -7,10 +7,12 @@ from importlib.metadata import entry_points
 from . import BlockError
 
 
+@cache
 def _import_item(key):
     """Look up an object by key.
 
     The returned object may be a class (if a Block key) or a function (if a dag key).
+    Lookups are cached, so each key is only imported and resolved once.
 
     See the Entry points specification at
     https://packaging.python.org/en/latest/specifications/entry-points/#entry-points.
@@ -40,7 +40,9 @@ def to_dot(dag: Dag, *, edge_label: str = 'label') -> str:
             seen.add(node)
 
     for src, dst in dag._block_pairs:
-        param_list = [(sname, dname) for (gname, sname), dname in dst._block_name_map.items() if gname == src.name]
+        param_list = [
+            (sname, dname) for (gname, sname), dnames in dst._block_name_map.items() if gname == src.name for dname in dnames
+        ]
         for sname, dname in param_list:
             p(f'  "{escapeq(src.name)}" -> "{escapeq(dst.name)}" [{edge_label}="{sname} → {dname}", penwidth=2]')
 
@@ -65,7 +65,6 @@ class _BokehDag:
             'ocount': [_count_param(block, 'out_') for block in topo_blocks],
         }
         self.cds = ColumnDataSource(data)
-        xys = {name: (x, y) for name, x, y in zip(data['name'], data['x'], data['y'])}
 
         SIZE = 0.25
 
@@ -82,12 +81,10 @@ class _BokehDag:
             radius_units='data',
         )
 
-        def next_to_topo(topo_blocks, b1, b2):
-            """Are blocks b1 and b2 next to each other in the topological sort?"""
-
-            ix = topo_blocks.index(b1)
-
-            return ix < len(topo_blocks) and topo_blocks[ix + 1] == b2
+        # The position of each block in the topological sort.
+        # Blocks are drawn at (ix, n-1-ix).
+        #
+        topo_ix = {block: ix for ix, block in enumerate(topo_blocks)}
 
         lw = 2
         side = True
@@ -95,9 +92,12 @@ class _BokehDag:
         OFFSET = 1.5 * SIZE
         h = math.sin(math.pi / 4) * OFFSET
         for b1, b2 in dag._block_pairs:
-            x0, y0 = xys[b1.name]
-            x1, y1 = xys[b2.name]
-            if next_to_topo(topo_blocks, b1, b2):
+            ix1 = topo_ix[b1]
+            ix2 = topo_ix[b2]
+            x0, y0 = ix1, n - 1 - ix1
+            x1, y1 = ix2, n - 1 - ix2
+            if ix2 == ix1 + 1:
+                # The blocks are next to each other in the topological sort.
                 # Draw a line directly from source to destination.
                 #
                 x0 += h
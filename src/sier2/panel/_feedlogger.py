@@ -1,83 +1,234 @@
 """A logger that logs to a panel.widget.Feed."""
 
+import atexit
+import copy
 import html
 import logging
+import logging.handlers
+import queue
+import re
+from functools import cache
 
 import panel as pn
 
 from .._block import BlockState
 from ._panel_util import _get_state_color
 
-_INFO_FORMATTER = logging.Formatter('%(asctime)s %(block_state)s %(block_name)s %(message)s', datefmt='%H:%M:%S')
-_FORMATTER = logging.Formatter(
-    '%(asctime)s %(block_state)s %(block_name)s - %(levelname)s - %(message)s',
-    datefmt='%H:%M:%S',
-)
+# The maximum number of messages kept in the log feed.
+# Each message is a live Bokeh model, so older messages are dropped.
+#
+MAX_FEED = 500
+
+# The maximum number of records waiting for the queue listener.
+# If the queue is full, records are emitted on the logging thread.
+#
+MAX_QUEUE = 10_000
+
+# INFO messages don't show the level, so the level and its separators
+# are set in PanelHandler.format() as level_sep.
+#
+_FORMATTER = logging.Formatter('%(asctime)s %(block_state)s %(block_name)s%(level_sep)s %(message)s', datefmt='%H:%M:%S')
+
+# The colored status marker for each block state.
+# These are fixed, so build them once instead of for every record.
+#
+_STATE_SPANS = {state: f'<span style="color:{_get_state_color(state)};">■</span>' for state in BlockState}
+
+
+# Characters that html.escape() replaces.
+#
+_UNSAFE = re.compile('[&<>"\']')
+
+
+def _escape(s: str) -> str:
+    """Escape s for HTML, skipping the copy if there is nothing to escape."""
+
+    return s if _UNSAFE.search(s) is None else html.escape(s)
+
+
+@cache
+def _name_html(block_name: str) -> str:
+    """The escaped, bracketed block name shown in a message.
+
+    There are only as many block names as there are blocks,
+    so escape each name once instead of for every record.
+    """
+
+    return f'[{_escape(block_name)}]' if block_name else ''
 
 
 class PanelHandler(logging.Handler):
-    """A handler that emits log strings to a panel template sidebar Feed pane."""
+    """A handler that emits log strings to a panel template sidebar Feed pane.
+
+    Creating a pane is relatively expensive, so when running in a Bokeh
+    session, messages logged before the next tick are joined into a single
+    ``pn.pane.HTML``. Outside a session, each message gets its own pane.
+
+    Records usually arrive on a queue listener thread, which has no
+    current document, so the document is taken from the record's
+    ``curdoc`` attribute if it has one.
+    """
 
     def __init__(self, log_feed):
         super().__init__()
         self.log_feed = log_feed
 
+        # Formatted messages waiting for the next tick.
+        #
+        self._pending: list[str] = []
+        self._clear_feed = False
+        self._scheduled = False
+
     def format(self, record):
         # TODO override logging.Formatter.formatException to <pre> the exception string.
 
-        color = _get_state_color(record.block_state)
+        # The record is shared with other handlers, so change a copy.
+        #
+        record = copy.copy(record)
 
-        record.block_name = f'[{html.escape(record.block_name)}]' if record.block_name else ''
-        record.block_state = f'<span style="color:{color};">■</span>'
-        record.msg = html.escape(record.msg)
-        fmt = _INFO_FORMATTER if record.levelno == logging.INFO else _FORMATTER
+        span = _STATE_SPANS.get(record.block_state)
+        if span is None:
+            span = f'<span style="color:{_get_state_color(record.block_state)};">■</span>'
 
-        return fmt.format(record)
+        record.block_name = _name_html(record.block_name)
+        record.block_state = span
+        # Escape the arguments as well as the message.
+        #
+        record.msg = _escape(record.getMessage())
+        record.args = None
 
-    def emit(self, record):
-        if record.block_state is None:
-            self.log_feed.clear()
-            return
+        record.level_sep = '' if record.levelno == logging.INFO else f' - {record.levelname} -'
 
+        return _FORMATTER.format(record)
+
+    def emit(self, record):
         try:
-            msg = self.format(record)
-            self.log_feed.append(pn.pane.HTML(msg))
+            if record.block_state is None:
+                # Clear the feed, including anything not yet shown.
+                #
+                self._pending.clear()
+                self._clear_feed = True
+            else:
+                self._pending.append(self.format(record))
+
+            doc = record.__dict__.get('curdoc', pn.state.curdoc)
+            if doc is None:
+                self._flush()
+            elif not self._scheduled:
+                self._scheduled = True
+                doc.add_next_tick_callback(self._flush)
         except RecursionError:  # See issue 36272
             raise
         except Exception:  # noqa: BLE001
             self.handleError(record)
 
+    def _flush(self):
+        """Update the feed with the pending messages as a single pane."""
+
+        # emit() is called with the handler lock held.
+        #
+        with self.lock:
+            pending = self._pending
+            clear_feed = self._clear_feed
+            self._pending = []
+            self._clear_feed = False
+            self._scheduled = False
+
+        # Each change to the feed is sent to the browser,
+        # so make at most one change per flush.
+        #
+        if not pending:
+            if clear_feed:
+                self.log_feed.clear()
+        elif clear_feed:
+            self.log_feed.objects = [pn.pane.HTML('<br>'.join(pending))]
+        else:
+            self._append('<br>'.join(pending))
+
+    def _append(self, msg: str):
+        pane = pn.pane.HTML(msg)
+        if len(self.log_feed) < MAX_FEED:
+            self.log_feed.append(pane)
+        else:
+            # Drop the oldest messages in the same update that adds the new one.
+            #
+            self.log_feed.objects = [*self.log_feed.objects[1 - MAX_FEED :], pane]
+
+
+class _FeedHandlers(logging.Handler):
+    """Pass records from the queue listener to the PanelHandler for each feed.
+
+    Each session has its own feed, so a record goes to the handler for the
+    document it was logged from. A record from a document that doesn't have
+    a feed goes to every feed.
+    """
 
-class DagPanelAdapter(logging.LoggerAdapter):
-    """An adapter that logs messages from a dag.
+    def __init__(self):
+        super().__init__()
+        self.handlers: dict[object, PanelHandler] = {}
+
+    def add(self, doc, handler: PanelHandler):
+        with self.lock:
+            self.handlers[doc] = handler
+
+    def remove(self, doc, handler: PanelHandler):
+        with self.lock:
+            if self.handlers.get(doc) is handler:
+                del self.handlers[doc]
+
+    def emit(self, record):
+        # emit() is called with the lock held.
+        #
+        doc_handler = self.handlers.get(record.__dict__.get('curdoc'))
+        handlers = [doc_handler] if doc_handler is not None else list(self.handlers.values())
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _PanelQueueHandler(logging.handlers.QueueHandler):
+    """A queue handler that leaves the formatting to the PanelHandlers.
+
+    The records stay in this process, so they are queued as is instead of
+    being formatted first. The current document is attached to each record
+    so the listener thread knows which session to update.
 
-    Each message also specifies a block name and state.
+    If the queue is full, the record is emitted on the logging thread
+    instead of being lost.
     """
 
-    def debug(self, msg, *args, block_name, block_state):
-        super().debug(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
+    def __init__(self, q: queue.Queue, handler: logging.Handler):
+        super().__init__(q)
+        self.handler = handler
 
-    def info(self, msg, *args, block_name, block_state):
-        super().info(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
+    def prepare(self, record):
+        # The record is shared with other handlers, so queue a copy.
+        #
+        record = copy.copy(record)
+        record.curdoc = pn.state.curdoc
 
-    def warning(self, msg, *args, block_name, block_state):
-        super().warning(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.handler.handle(record)
 
-    def error(self, msg, *args, block_name, block_state):
-        super().error(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
 
-    def exception(self, msg, *args, block_name, block_state):
-        super().exception(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
+class DagPanelAdapter(logging.LoggerAdapter):
+    """An adapter that logs messages from a dag.
 
-    def critical(self, msg, *args, block_name, block_state):
-        super().critical(msg, *args, extra={'block_name': block_name, 'block_state': block_state})
+    Each message also specifies a block name and state, using the
+    ``block_name`` and ``block_state`` keyword arguments of the
+    standard logging methods.
+    """
 
     def process(self, msg, kwargs):
-        # print(f'ADAPTER {msg=} {kwargs=} {self.extra=}')
-        if 'block_state' not in kwargs['extra']:
-            kwargs['extra']['block_state'] = '?'
-        if 'block_name' not in kwargs['extra']:
-            kwargs['extra']['block_name'] = 'g'
+        kwargs['extra'] = {
+            'block_name': kwargs.pop('block_name', 'g'),
+            'block_state': kwargs.pop('block_state', '?'),
+        }
 
         return msg, kwargs
 
@@ -92,15 +243,50 @@ _logger.setLevel(logging.INFO)
 # _logger.addHandler(ph)
 
 
+# The PanelHandler for each feed, keyed by the feed's document.
+#
+_feed_handlers = _FeedHandlers()
+
+
+@cache
+def _start_listener() -> queue.Queue:
+    """Start the queue listener that passes records to the feeds.
+
+    Every feed is updated by the same listener thread, so this is only done once.
+    The listener is stopped at exit.
+    """
+
+    q: queue.Queue = queue.Queue(maxsize=MAX_QUEUE)
+    listener = logging.handlers.QueueListener(q, _feed_handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    _logger.addHandler(_PanelQueueHandler(q, _feed_handlers))
+
+    return q
+
+
 def getDagPanelLogger(log_feed):
+    """A logger for dags that logs to log_feed.
+
+    Formatting messages and updating the feed happens on a queue listener
+    thread, so logging doesn't hold up the dag. The feed is dropped when
+    the current session is destroyed. Outside a session, the most recent
+    feed replaces any earlier one.
+    """
+
     # _logger = logging.getLogger('block.panel')
     # _logger.setLevel(logging.INFO)
 
     ph = PanelHandler(log_feed)
-    ph.log_feed = log_feed
     ph.setLevel(logging.INFO)
 
-    _logger.addHandler(ph)
+    _start_listener()
+
+    doc = pn.state.curdoc
+    _feed_handlers.add(doc, ph)
+    if doc is not None:
+        pn.state.on_session_destroyed(lambda _session_context: _feed_handlers.remove(doc, ph))
 
     adapter = DagPanelAdapter(_logger)
 
@@ -120,61 +306,13 @@ class BlockPanelAdapter(logging.LoggerAdapter):
     implicit.
     """
 
-    def __init__(self, logger, block_name, extra=None):
-        super().__init__(logger, extra)
+    def __init__(self, logger, block_name):
+        # The extra values are the same for every message,
+        # so build them once and let LoggerAdapter.process() pass them on.
+        #
+        super().__init__(logger, {'block_name': block_name, 'block_state': BlockState.BLOCK})
         self.block_name = block_name
 
-    def debug(self, msg, *args):
-        super().debug(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def info(self, msg, *args):
-        super().info(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def warning(self, msg, *args):
-        super().warning(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def error(self, msg, *args):
-        super().error(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def exception(self, msg, *args):
-        super().exception(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def critical(self, msg, *args):
-        super().critical(
-            msg,
-            *args,
-            extra={'block_name': self.block_name, 'block_state': BlockState.BLOCK},
-        )
-
-    def process(self, msg, kwargs):
-        # print(f'GP ADAPTER {msg=} {kwargs=} {self.extra=}')
-        if 'block_state' not in kwargs['extra']:
-            kwargs['extra']['block_state'] = BlockState.BLOCK
-        if 'block_name' not in kwargs['extra']:
-            kwargs['extra']['block_name'] = self.block_name
-
-        return msg, kwargs
-
 
 def getBlockPanelLogger(block_name: str):
     """A logger for blocks.
@@ -1,10 +1,11 @@
-import ctypes
 import html
+import logging
 import os
 import sys
 import threading
+import time
 from collections.abc import Iterable
-from datetime import datetime
+from functools import cache
 
 import panel as pn
 import param
@@ -29,31 +30,49 @@ INFO_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" vie
 </svg>
 '''
 
-if '_pyodide' in sys.modules:
-    # Pyodide (to be specific, WASM) doesn't allow threads.
-    # Specifying one thread for panel for some reason tries to start one, so we need to rely on the default.
-    #
-    pn.extension(
-        'floatpanel',
-        inline=True,
-        loading_spinner='bar',
-        notifications=True,
-    )
-else:
-    pn.extension(
-        'floatpanel',
-        inline=True,
-        nthreads=NTHREADS,
-        loading_spinner='bar',
-        notifications=True,
-    )
+
+@cache
+def _load_extension():
+    """Load the panel extension the first time a dag is shown.
+
+    Loading it when this module is imported would make everything that
+    imports the module pay for it, whether or not a dag is shown.
+    """
+
+    if '_pyodide' in sys.modules:
+        # Pyodide (to be specific, WASM) doesn't allow threads.
+        # Specifying one thread for panel for some reason tries to start one, so we need to rely on the default.
+        #
+        pn.extension(
+            'floatpanel',
+            inline=True,
+            loading_spinner='bar',
+            notifications=True,
+        )
+    else:
+        pn.extension(
+            'floatpanel',
+            inline=True,
+            nthreads=NTHREADS,
+            loading_spinner='bar',
+            notifications=True,
+        )
 
 
 def _hms(sec):
-    h, sec = divmod(int(sec), 3600)
-    m, sec = divmod(sec, 60)
+    # Most blocks finish in less than a minute.
+    #
+    s = int(sec)
+    if s < 60:
+        return f'00:00:{s:02}'
+
+    m, s = divmod(s, 60)
+    if m < 60:
+        return f'00:{m:02}:{s:02}'
 
-    return f'{h:02}:{m:02}:{sec:02}'
+    h, m = divmod(m, 60)
+
+    return f'{h:02}:{m:02}:{s:02}'
 
 
 class _PanelContext:
@@ -73,7 +92,13 @@ class _PanelContext:
     def __enter__(self):
         state = BlockState.EXECUTING
         self.block._block_state = state
-        self.t0 = datetime.now().astimezone()
+        self.t0 = time.perf_counter()
+
+        # Let the block see the stopper, so a long-running block
+        # can use check_stop() to stop when the Stop switch is used.
+        #
+        self.block._stopper = getattr(self.dag, '_stopper', None)
+
         if self.dag_logger:
             self.dag_logger.info('Execute', block_name=self.block.name, block_state=state)
 
@@ -86,7 +111,13 @@ class _PanelContext:
         return self.block
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        delta = (datetime.now().astimezone() - self.t0).total_seconds()
+        # The block is no longer being executed by the dag,
+        # so check_stop() must not see the dag's stopper.
+        # Do this first, because an error below is re-raised.
+        #
+        self.block._stopper = None
+
+        delta = time.perf_counter() - self.t0
 
         # if self.block._progress:
         #     self.block._progress.active = False
@@ -94,20 +125,26 @@ class _PanelContext:
         if exc_type is None:
             state = BlockState.WAITING if self.block._wait_for_input else BlockState.SUCCESSFUL
             self.block._block_state = state
-            if self.dag_logger:
+
+            # Don't format the duration if the message is going to be dropped.
+            # The message itself is formatted by the log handler.
+            #
+            if self.dag_logger and self.dag_logger.isEnabledFor(logging.INFO):
                 self.dag_logger.info(
-                    f'after {_hms(delta)}',
+                    'after %s',
+                    _hms(delta),
                     block_name=self.block.name,
                     block_state=state.value,
                 )
-        elif isinstance(exc_type, KeyboardInterrupt):
+        elif issubclass(exc_type, KeyboardInterrupt):
             state = BlockState.INTERRUPTED
             self.block._block_state = state
             if not self.dag._is_pyodide:
                 self.dag._stopper.event.set()
             if self.dag_logger:
                 self.dag_logger.exception(
-                    f'KEYBOARD INTERRUPT after {_hms(delta)}',
+                    'KEYBOARD INTERRUPT after %s',
+                    _hms(delta),
                     block_name=self.block.name,
                     block_state=state,
                 )
@@ -117,7 +154,8 @@ class _PanelContext:
             if exc_type is not BlockValidateError:
                 if self.dag_logger:
                     self.dag_logger.exception(
-                        f'after {_hms(delta)}',
+                        'after %s',
+                        _hms(delta),
                         block_name=self.block.name,
                         block_state=state,
                     )
@@ -142,21 +180,9 @@ def _quit(session_context):
     sys.exit()
 
 
-def interrupt_thread(tid, exctype):
-    """Raise exception exctype in thread tid."""
-
-    r = ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(tid), ctypes.py_object(exctype))
-    if r == 0:
-        raise ValueError('Invalid thread id')
-    elif r != 1:
-        # "if it returns a number greater than one, you're in trouble,
-        # and you should call it again with exc=NULL to revert the effect"
-        #
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(tid), None)
-        raise SystemError('PyThreadState_SetAsyncExc failed')
-
-
 def _prepare_to_show(dag: 'PanelDag'):
+    _load_extension()
+
     # Replace the default text-based context with the panel-based context.
     #
     dag._block_context = _PanelContext
@@ -168,23 +194,17 @@ def _prepare_to_show(dag: 'PanelDag'):
     info_fp_holder = pn.Column(visible=False)
 
     sidebar_title = pn.Row(info_button, '## Blocks')
-    template = pn.template.BootstrapTemplate(
-        site=dag.site,
-        title=dag.title,
-        theme='dark',
-        header_background='#1e2329',
-        header_color='#7dd3fc',
-        sidebar=pn.Column(sidebar_title),
-        collapsed_sidebar=True,
-        sidebar_width=440,
-        logo=dag.logo,
-        favicon=dag.favicon,
-    )
+    # The dag documentation doesn't change, so build it on the first request.
+    #
+    info_text = []
 
     def display_info(_event):
         """Display a FloatPanel containing help for the dag and blocks."""
 
-        text = dag_doc(dag)
+        if not info_text:
+            info_text.append(dag_doc(dag))
+
+        text = info_text[0]
         config = {'headerControls': {'maximize': 'remove'}, 'contentOverflow': 'scroll'}
         fp = pn.layout.FloatPanel(
             text,
@@ -203,34 +223,18 @@ def _prepare_to_show(dag: 'PanelDag'):
     switch = pn.widgets.Switch(name='Stop')
 
     def on_switch(event):
-        if switch.value:
+        if event.new:
+            # Ask the dag to stop. No further blocks are executed.
+            # A block that is executing stops when it next calls
+            # block.check_stop(); otherwise, it is allowed to finish.
+            #
             dag.stop()
             # reset()
-
-            # Which thread are we running on?
-            #
-            current_tid = threading.current_thread().ident
-
-            # What other threads are running?
-            # There are multiple threads running, including the main thread
-            # and the bokeh server thread. We need to find the panel threads.
-            # Unfortunately, there is nothing special about them.
-            #
-            print('THREADS', current_tid, [t for t in threading.enumerate()])
-            all_threads = [t for t in threading.enumerate() if t.name.startswith('ThreadPoolExecutor')]
-            assert len(all_threads) <= NTHREADS, f'{all_threads=}'
-            other_thread = [t for t in all_threads if t.ident != current_tid]
-
-            # It's possible that since the user might not have done anything yet,
-            # another thread hasn't spun up.
-            #
-            if other_thread:
-                interrupt_thread(other_thread[0].ident, KeyboardInterrupt)
         else:
             dag.unstop()
             # TODO reset status for each card
 
-    pn.bind(on_switch, switch, watch=True)
+    switch.param.watch(on_switch, 'value')
 
     # def reset():
     #     """Experiment: reset the status lights."""
@@ -263,31 +267,65 @@ def _prepare_to_show(dag: 'PanelDag'):
 
     # cards.extend(BlockCard(parent_template=template, dag=dag, block=gw, dag_logger=dag_logger) for gw in dag.get_sorted() if gw._visible)
 
-    def dag_continue(self, _event):
-        template.main[0].loading = True
+    def execute_after_input(block: Block):
+        if dag_logger:
+            dag_logger.info('', block_name=None, block_state=None)
+            dag_logger.info('Execute dag', block_name='', block_state=BlockState.DAG)
 
+        # We want this block's execute() method to run first
+        # after the user clicks the "Continue" button.
+        # We make this happen by pushing this block on the head
+        # of the queue, but without any values - we don't want
+        # to trigger any param changes.
+        #
         try:
-            if dag_logger:
-                dag_logger.info('', block_name=None, block_state=None)
-                dag_logger.info('Execute dag', block_name='', block_state=BlockState.DAG)
-
-            # We want this block's execute() method to run first
-            # after the user clicks the "Continue" button.
-            # We make this happen by pushing this block on the head
-            # of the queue, but without any values - we don't want
-            # to trigger any param changes.
+            dag.execute_after_input(block, dag_logger=dag_logger)
+        except BlockValidateError as e:
+            # Display the error as a notification.
             #
-            try:
-                dag.execute_after_input(self, dag_logger=dag_logger)
-            except BlockValidateError as e:
-                # Display the error as a notification.
-                #
-                block_name = html.escape(e.block_name)
-                error = html.escape(str(e))
-                notif = f'<b>{block_name}</b>:<br>{error}'
-                pn.state.notifications.error(notif, duration=0)
-        finally:
-            template.main[0].loading = False
+            block_name = html.escape(e.block_name)
+            error = html.escape(str(e))
+            notif = f'<b>{block_name}</b>:<br>{error}'
+            pn.state.notifications.error(notif, duration=0)
+
+    # Panel runs callbacks on multiple threads, so a "Continue" click can
+    # arrive while the dag is still executing. Rather than executing the dag
+    # concurrently, remember the most recent such block and continue from it
+    # when the current execution finishes.
+    #
+    continue_lock = threading.Lock()
+    continue_running = False
+    continue_pending: Block | None = None
+
+    def dag_continue(self, _event):
+        nonlocal continue_running, continue_pending
+
+        with continue_lock:
+            if continue_running:
+                continue_pending = self
+                return
+
+            continue_running = True
+
+        cards_column.loading = True
+        block = self
+        try:
+            while block is not None:
+                execute_after_input(block)
+
+                with continue_lock:
+                    block = continue_pending
+                    continue_pending = None
+                    if block is None:
+                        continue_running = False
+                        cards_column.loading = False
+        except BaseException:
+            with continue_lock:
+                continue_running = False
+                continue_pending = None
+                cards_column.loading = False
+
+            raise
 
     # Be lazy to avoid a circular import.
     #
@@ -299,23 +337,43 @@ def _prepare_to_show(dag: 'PanelDag'):
             block._dag_continue = dag_continue.__get__(block)
             cards.append(card)
 
-    template.main.append(pn.panel(pn.Column(*cards)))
+    # The cards are already panel objects, so pass them as the column's
+    # objects in one go rather than having each one converted and added.
+    # dag_continue() uses the column directly rather than looking it up
+    # in the template for every click.
+    #
+    cards_column = pn.Column(objects=cards)
 
     author = dag.author['name'] if dag.author else 'Unknown'
     email = dag.author['email'] if dag.author else 'Unknown'
-    template.sidebar.append(
-        pn.Column(
-            switch,
-            pn.Row(
-                dag_pane(dag),
-                max_width=400,
-                max_height=200,
-            ),
-            log_feed,
-            info_fp_holder,
-            pn.widgets.StaticText(value=f'Author: {author}', margin=0),
-            pn.widgets.StaticText(value=f'Email: {email}', margin=0),
-        )
+    sidebar_content = pn.Column(
+        switch,
+        pn.Row(
+            dag_pane(dag),
+            max_width=400,
+            max_height=200,
+        ),
+        log_feed,
+        info_fp_holder,
+        pn.widgets.StaticText(value=f'Author: {author}', margin=0),
+        pn.widgets.StaticText(value=f'Email: {email}', margin=0),
+    )
+
+    # Create the template with its contents,
+    # rather than appending them to the template one at a time.
+    #
+    template = pn.template.BootstrapTemplate(
+        site=dag.site,
+        title=dag.title,
+        theme='dark',
+        header_background='#1e2329',
+        header_color='#7dd3fc',
+        main=[cards_column],
+        sidebar=[pn.Column(sidebar_title), sidebar_content],
+        collapsed_sidebar=True,
+        sidebar_width=440,
+        logo=dag.logo,
+        favicon=dag.favicon,
     )
 
     return template
@@ -1,37 +1,29 @@
 from .._block import Block, BlockState
 from .._util import trim
 
+# The colors are arbitrary, except for BLOCK. When a block logs a message,
+# it is executing by definition, so no color is required.
+#
+_STATE_COLORS = {
+    BlockState.BLOCK: 'var(--panel-background-color)',
+    BlockState.DAG: 'grey',
+    BlockState.INPUT: '#f0c820',
+    BlockState.READY: 'white',
+    BlockState.EXECUTING: 'steelblue',
+    BlockState.WAITING: 'yellow',
+    BlockState.SUCCESSFUL: 'green',
+    BlockState.INTERRUPTED: 'orange',
+    BlockState.ERROR: 'red',
+}
+
 
 def _get_state_color(gs: BlockState) -> str:
     """Convert a block state (as logged by the dag) to a color.
 
-    The colors are arbitrary, except for BLOCK. When a block logs a message,
-    it is executing by definition, so no color is required.
+    Unknown states are magenta.
     """
 
-    match gs:
-        case BlockState.BLOCK:
-            color = 'var(--panel-background-color)'
-        case BlockState.DAG:
-            color = 'grey'
-        case BlockState.INPUT:
-            color = '#f0c820'
-        case BlockState.READY:
-            color = 'white'
-        case BlockState.EXECUTING:
-            color = 'steelblue'
-        case BlockState.WAITING:
-            color = 'yellow'
-        case BlockState.SUCCESSFUL:
-            color = 'green'
-        case BlockState.INTERRUPTED:
-            color = 'orange'
-        case BlockState.ERROR:
-            color = 'red'
-        case _:
-            color = 'magenta'
-
-    return color
+    return _STATE_COLORS.get(gs, 'magenta')
 
 
 ########
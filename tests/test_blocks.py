@@ -58,6 +58,11 @@ def test_params():
     pb = ParamBlock(only_in=True)
     assert pb.pick_params() == ['in_a', 'in_b']
 
+    # The picked names are cached, so make sure callers can't change them.
+    #
+    pb.pick_params().append('c')
+    assert pb.pick_params() == ['in_a', 'in_b']
+
 
 def test_output_must_not_allow_refs(Dag_f):
     class ARFalse(Block):
@@ -327,6 +332,14 @@ def test_call_block():
     assert result == {'out_a': 6}
 
 
+def test_call_block_only_inputs():
+    """Only input params can be specified when calling a block."""
+
+    a = Add(1)
+    with pytest.raises(BlockError, match='Only input params can be specified: out_a'):
+        a(out_a=5)
+
+
 def test_init_called():
     class A(Block):
         """."""
@@ -380,3 +393,25 @@ def test_watched(Dag_f):
 
     with pytest.raises(BlockError, match='at index 0 has watchers'):
         Dag_f([(b.param.out_p, a.param.in_p)])
+
+
+def test_block_docstring():
+    """A block class must have a docstring."""
+
+    with pytest.raises(BlockError, match='must have a docstring'):
+
+        class NoDoc(Block):
+            in_a = param.Integer()
+
+
+def test_block_logger():
+    """A block's logger is created when it is first used."""
+
+    a = Add(1)
+    assert 'logger' not in a.__dict__
+
+    logger = a.logger
+    assert logger is a.logger
+
+    with pytest.raises(AttributeError):
+        _ = a.no_such_attribute
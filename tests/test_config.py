@@ -1,3 +1,4 @@
+import os
 import tempfile
 from pathlib import Path
 
@@ -68,6 +69,27 @@ int1 = 1
         _string1 = Config['block.badvalue', 'string1']
 
 
+def test_cached_values():
+    INI = '''
+[block.cached]
+list1 = [1, 2]
+'''
+    Config._clear()
+    Config._load_string(INI)
+
+    # Values are evaluated once, but changing a returned value
+    # must not change the config.
+    #
+    Config['block.cached']['list1'].append(3)
+    Config['block.cached', 'list1'].append(3)
+    assert Config['block.cached'] == {'list1': [1, 2]}
+
+    # Loading a new config discards the cached values.
+    #
+    Config._load_string(INI.replace('[1, 2]', '[3]'))
+    assert Config['block.cached', 'list1'] == [3]
+
+
 def test_update():
     # Initial config.
     #
@@ -124,3 +146,72 @@ key4a = 'value4a-new'
         assert Config['section4', 'key4a'] == 'value4a-new'
     finally:
         tmp_config.unlink()
+
+
+def test_reload_if_changed():
+    tmp_config = Path(tempfile.gettempdir()) / CONFIG_NAME
+    with open(tmp_config, 'w') as f:
+        print('[section1]\nkey1 = 1', file=f)
+
+    try:
+        Config._clear()
+        Config.location = tmp_config
+
+        # Nothing to reload until the config has been loaded.
+        #
+        assert not Config.reload_if_changed()
+        assert Config['section1', 'key1'] == 1
+        assert not Config.reload_if_changed()
+
+        with open(tmp_config, 'w') as f:
+            print('[section1]\nkey1 = 2', file=f)
+
+        # Make sure the modification time changes.
+        #
+        st = tmp_config.stat()
+        os.utime(tmp_config, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert Config.reload_if_changed()
+        assert Config['section1', 'key1'] == 2
+    finally:
+        tmp_config.unlink()
+
+
+def test_reload_after_update():
+    tmp_config = Path(tempfile.gettempdir()) / CONFIG_NAME
+
+    def touch():
+        st = tmp_config.stat()
+        os.utime(tmp_config, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    with open(tmp_config, 'w') as f:
+        print('[section1]\nkey1 = 1', file=f)
+
+    try:
+        # An update that isn't written is not lost when the file changes.
+        #
+        Config._clear()
+        Config.location = tmp_config
+        Config._update('[section1]\nkey1 = 2', write_to_file=False)
+        touch()
+
+        assert not Config.reload_if_changed()
+        assert Config['section1', 'key1'] == 2
+
+        # An update that is written matches the file, so a later
+        # change to the file is reloaded.
+        #
+        Config._clear()
+        Config.location = tmp_config
+        Config._update('[section1]\nkey1 = 3', write_to_file=True)
+        assert not Config.reload_if_changed()
+
+        with open(tmp_config, 'w') as f:
+            print('[section1]\nkey1 = 4', file=f)
+
+        touch()
+
+        assert Config.reload_if_changed()
+        assert Config['section1', 'key1'] == 4
+    finally:
+        tmp_config.unlink()
@@ -1,3 +1,5 @@
+import threading
+
 import param
 import pytest
 
@@ -589,6 +591,65 @@ def test_downstream_blocks7(Dag_f):
     assert all(i._block_state == BlockState.SUCCESSFUL for i in [c, d, h])
 
 
+def test_check_stop(Dag_f):
+    """A block that calls check_stop() stops executing when the dag is stopped."""
+
+    class Looper(Block):
+        """Loop until the dag is stopped."""
+
+        in_p = param.Integer(default=0)
+        out_p = param.Integer(default=0)
+
+        def __init__(self):
+            super().__init__()
+            self.started = threading.Event()
+            self.forever = True
+
+        def execute(self):
+            self.started.set()
+            while True:
+                self.check_stop()
+                self.out_p += 1
+                if not self.forever:
+                    break
+
+    p = PassThrough()
+    looper = Looper()
+    last = PassThrough()
+    dag = Dag_f([(p.param.out_p, looper.param.in_p), (looper.param.out_p, last.param.in_p)])
+
+    errors = []
+
+    def run():
+        try:
+            dag.execute()
+        except KeyboardInterrupt as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert looper.started.wait(timeout=10)
+
+    dag.stop()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert looper._block_state == BlockState.INTERRUPTED
+    assert last._block_state == BlockState.READY
+
+    # Outside a dag, check_stop() does nothing, even though the dag
+    # that last executed the block is still stopped.
+    #
+    assert dag._stopper.is_stopped
+    looper.forever = False
+    out_p = looper.out_p
+    try:
+        assert looper(in_p=3) == {'out_p': out_p + 1}
+    except KeyboardInterrupt:
+        pytest.fail('check_stop() raised outside the dag')
+
+
 # def test_connect_after_execute(dag):
 #     class PassThrough(Block):
 #         """Pass a value through unchanged."""
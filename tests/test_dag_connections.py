@@ -73,6 +73,43 @@ def test_build2(Dag_f):
     assert b2.out_p1 == 86
     assert b2.out_p2 == 99
 
+    # Both connections are along the same edge.
+    #
+    assert dag._block_pairs == {(b1, b2): 2}
+
+
+def test_one_watcher_per_src(Dag_f):
+    """A src block connected to several dst blocks has a single watcher."""
+
+    b1 = PassThrough()
+    b2 = PassThrough()
+    b3 = PassThrough()
+
+    dag = Dag_f([(b1.param.out_p, b2.param.in_p), (b1.param.out_p, b3.param.in_p)])
+
+    assert len(b1.param.watchers['out_p']['value']) == 1
+
+    b1.in_p = 86
+    dag.execute()
+
+    assert b2.out_p == 86
+    assert b3.out_p == 86
+
+
+def test_one_out_to_two_in(Dag_f):
+    """An out param connected to two in params of the same block sets both."""
+
+    b1 = PassThrough()
+    b2 = PassThrough2()
+
+    dag = Dag_f([(b1.param.out_p, b2.param.in_p1), (b1.param.out_p, b2.param.in_p2)])
+
+    b1.in_p = 7
+    dag.execute()
+
+    assert b2.out_p1 == 7
+    assert b2.out_p2 == 7
+
 
 def test_build_dup_params(Dag_f):
     b1 = PassThrough()
@@ -85,6 +122,20 @@ def test_build_dup_params(Dag_f):
         ])
 
 
+def test_build_dup_params_one_out_to_two_in(Dag_f):
+    """Repeating either connection from one out param to two in params is rejected."""
+
+    b1 = PassThrough()
+    b2 = PassThrough2()
+
+    with pytest.raises(BlockError, match='params at index 2 are already connected'):
+        Dag_f([
+            (b1.param.out_p, b2.param.in_p1),
+            (b1.param.out_p, b2.param.in_p2),
+            (b1.param.out_p, b2.param.in_p1),
+        ])
+
+
 def test_not_a_block_instance(Dag_f):
     """Check that a Block object is used, not the Block class."""
     b1 = PassThrough()
@@ -3,6 +3,7 @@ import random
 import param
 
 from sier2 import Block, Dag
+from sier2._dag import _closes_cycle, topological_sort
 
 
 class PassThrough(Block):
@@ -113,3 +114,33 @@ def test_execute_heads(Dag_f):
 
     assert tail.out_p == 0
     assert execute_order == defined_order
+
+
+def test_sort_remaining():
+    """Edges that can't be sorted because of a cycle are returned as remaining."""
+
+    a = PassThrough(name='a')
+    b = PassThrough(name='b')
+    c = PassThrough(name='c')
+    for i, block in enumerate([a, b, c]):
+        block._sort_key = i
+
+    ordered, remaining = topological_sort([(a, b), (b, c), (c, b)])
+
+    assert ordered == [a]
+    assert remaining == [(b, c), (c, b)]
+
+
+def test_closes_cycle():
+    """Only a pair whose dst is upstream of its src closes a cycle."""
+
+    a = PassThrough(name='a')
+    b = PassThrough(name='b')
+    c = PassThrough(name='c')
+    d = PassThrough(name='d')
+    incoming = {b: [a], c: [b]}
+
+    assert _closes_cycle(incoming, c, a)
+    assert _closes_cycle(incoming, c, b)
+    assert not _closes_cycle(incoming, a, c)
+    assert not _closes_cycle(incoming, c, d)
@@ -0,0 +1,137 @@
+# Test the panel feed logger.
+#
+
+import logging
+
+import panel as pn
+
+from sier2 import BlockState
+from sier2.panel import _feedlogger
+from sier2.panel._feedlogger import PanelHandler, getDagPanelLogger
+
+
+class FakeDoc:
+    """Collect next tick callbacks instead of running them."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add_next_tick_callback(self, callback):
+        self.callbacks.append(callback)
+
+
+def _record(doc, msg, block_state):
+    record = logging.LogRecord('test', logging.INFO, __file__, 0, msg, None, None)
+    record.block_name = 'b'
+    record.block_state = block_state
+    record.curdoc = doc
+
+    return record
+
+
+def test_flush_once_per_tick():
+    """Messages logged before the next tick are shown in a single pane."""
+
+    doc = FakeDoc()
+    feed = pn.Feed()
+    handler = PanelHandler(feed)
+
+    handler.handle(_record(doc, 'one', BlockState.DAG))
+    handler.handle(_record(doc, 'two', BlockState.DAG))
+
+    assert len(doc.callbacks) == 1
+    assert len(feed) == 0
+
+    doc.callbacks[0]()
+
+    assert len(feed) == 1
+    assert 'one' in feed[0].object
+    assert 'two' in feed[0].object
+
+
+def test_clear_then_log():
+    """Clearing the feed drops earlier messages, including pending ones."""
+
+    doc = FakeDoc()
+    feed = pn.Feed(pn.pane.HTML('old'))
+    handler = PanelHandler(feed)
+
+    handler.handle(_record(doc, 'pending', BlockState.DAG))
+    handler.handle(_record(doc, '', None))
+    handler.handle(_record(doc, 'new', BlockState.DAG))
+    doc.callbacks[0]()
+
+    assert len(feed) == 1
+    assert 'pending' not in feed[0].object
+    assert 'new' in feed[0].object
+
+
+def test_escape_args():
+    """Message arguments are escaped along with the message."""
+
+    doc = FakeDoc()
+    feed = pn.Feed()
+    handler = PanelHandler(feed)
+
+    record = _record(doc, 'after %s', BlockState.DAG)
+    record.args = ('<b>',)
+    handler.handle(record)
+    doc.callbacks[0]()
+
+    assert 'after &lt;b&gt;' in feed[0].object
+
+
+def test_max_feed(monkeypatch):
+    """The feed keeps the most recent MAX_FEED messages."""
+
+    monkeypatch.setattr(_feedlogger, 'MAX_FEED', 3)
+    feed = pn.Feed()
+    handler = PanelHandler(feed)
+
+    for i in range(5):
+        handler.handle(_record(None, f'msg{i}', BlockState.DAG))
+
+    assert len(feed) == 3
+    assert 'msg2' in feed[0].object
+    assert 'msg4' in feed[-1].object
+
+
+class RecordHandler(logging.Handler):
+    """Keep the records that are logged."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_dag_panel_logger():
+    """Messages logged by a dag reach the feed through the queue listener
+    without changing the record seen by other handlers."""
+
+    feed = pn.Feed()
+    dag_logger = getDagPanelLogger(feed)
+
+    other = RecordHandler()
+    dag_logger.logger.addHandler(other)
+    try:
+        dag_logger.info('after %s', '<b>', block_name='a<b', block_state=BlockState.SUCCESSFUL)
+
+        # Wait for the listener to handle the record.
+        #
+        _feedlogger._start_listener().join()
+    finally:
+        dag_logger.logger.removeHandler(other)
+
+    assert len(feed) == 1
+    assert '[a&lt;b] after &lt;b&gt;' in feed[0].object
+    assert _feedlogger._STATE_SPANS[BlockState.SUCCESSFUL] in feed[0].object
+
+    assert len(other.records) == 1
+    record = other.records[0]
+    assert record.getMessage() == 'after <b>'
+    assert record.block_name == 'a<b'
+    assert record.block_state == BlockState.SUCCESSFUL
+    assert not hasattr(record, 'curdoc')
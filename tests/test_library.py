@@ -1,4 +1,6 @@
-from sier2 import Block, Library
+import pytest
+
+from sier2 import Block, BlockError, Library
 
 
 class Block1(Block):
@@ -20,3 +22,26 @@ def test_library_get():
     # print(b_lib.block_key())
 
     assert b.block_key() == b_lib.block_key()
+
+
+def test_library_invalidate():
+    """Invalidating the library forgets its blocks, so the library can be rebuilt."""
+
+    class Block2(Block):
+        """Another old block."""
+
+    key = 'tests.invalidate.Block1'
+    Library.add_block(Block1, key)
+    assert Library.get_block(key) is Block1
+
+    Library.invalidate()
+
+    with pytest.raises(BlockError, match='not in the library'):
+        Library.get_block(key)
+
+    # The key is free again, so a different block can use it.
+    #
+    Library.add_block(Block2, key)
+    assert Library.get_block(key) is Block2
+
+    Library.invalidate()
@@ -29,3 +29,14 @@ def test_has_panel():
     _p = b.__panel__()
 
     assert hasattr(b, '_panel')
+
+
+def test_hms():
+    """Durations are formatted as hours, minutes, and seconds."""
+
+    from sier2.panel._panel import _hms
+
+    assert _hms(5.7) == '00:00:05'
+    assert _hms(60) == '00:01:00'
+    assert _hms(3599) == '00:59:59'
+    assert _hms(90061) == '25:01:01'
@@ -116,3 +116,50 @@ def test_serialise(Dag_f):
     # Dumping again should produce the same dump.
     #
     assert dump == dag2.dump()
+
+
+class Source(Block):
+    """Pass a value to more than one input."""
+
+    in_p = param.Integer()
+    out_p = param.Integer()
+
+    def execute(self):
+        self.out_p = self.in_p
+
+
+class Sum(Block):
+    """Add two inputs."""
+
+    in_a = param.Integer()
+    in_b = param.Integer()
+    out_sum = param.Integer()
+
+    def execute(self):
+        self.out_sum = self.in_a + self.in_b
+
+
+def test_serialise_one_out_to_two_in(Dag_f):
+    """An out param connected to two in params of the same block survives a round trip."""
+
+    src = Source()
+    dst = Sum()
+    dag = Dag_f([(src.param.out_p, dst.param.in_a), (src.param.out_p, dst.param.in_b)])
+
+    dump = dag.dump()
+    assert len(dump['connections']) == 1
+    conn_args = dump['connections'][0]['conn_args']
+    assert [(a['src_param_name'], a['dst_param_name']) for a in conn_args] == [('out_p', 'in_a'), ('out_p', 'in_b')]
+
+    Library.add_block(Source)
+    Library.add_block(Sum)
+
+    dag2 = Library.load_dag(dump)
+    src2 = dag2.block_by_name(src.name)
+    dst2 = dag2.block_by_name(dst.name)
+
+    src2.in_p = 3
+    dag2.execute()
+    assert dst2.out_sum == 6
+
+    assert dump == dag2.dump()